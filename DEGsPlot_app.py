@@ -13,6 +13,9 @@ streamlit run streamlit_app.py
 ```
 """
 
+import io
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -21,9 +24,9 @@ import plotly.express as px
 st.set_page_config(page_title="RNA‑seq DE Explorer", layout="wide")
 
 @st.cache_data
-def load_data(path: str) -> pd.DataFrame:
-    """Load differential expression results from a CSV file."""
-    df = pd.read_csv(path, index_col=0)
+def load_data(file_bytes: bytes) -> pd.DataFrame:
+    """Load differential expression results from the bytes of a CSV file."""
+    df = pd.read_csv(io.BytesIO(file_bytes), index_col=0)
     return df
 
 
@@ -36,7 +39,7 @@ def main() -> None:
     )
 
     if uploaded_file is not None:
-        df = load_data(uploaded_file)
+        df = load_data(uploaded_file.getvalue())
         st.sidebar.success("Loaded {} genes".format(len(df)))
 
         # Filter options
@@ -47,10 +50,10 @@ def main() -> None:
             "Absolute log2 fold change threshold", min_value=0.0, max_value=5.0, value=1.0, step=0.1
         )
 
-        # Apply filters
-        df["significant"] = (
-            (df["adj.P.Val"] < pval_threshold) & (df["logFC"].abs() > logfc_threshold)
-        )
+        # Apply filters on the raw arrays, skipping pandas index alignment
+        padj = df["adj.P.Val"].to_numpy()
+        logfc = df["logFC"].to_numpy()
+        df["significant"] = (padj < pval_threshold) & (np.abs(logfc) > logfc_threshold)
 
         # Main plot
         fig = px.scatter(
@@ -61,6 +64,7 @@ def main() -> None:
             hover_name=df.index,
             labels={"logFC": "Log2 fold change", "P.Value": "p‑value"},
             title="Volcano plot (interactive)",
+            render_mode="webgl",
         )
         fig.update_yaxes(type="log")
         st.plotly_chart(fig, use_container_width=True)
@@ -1,14 +1,106 @@
 import streamlit as st
 import pandas as pd
-import re
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import io
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from typing import Optional, Tuple
 
 st.set_page_config(page_title="GO/KEGG Enrichment Visualizer", layout="wide")
 
 st.title("🧬 GO/KEGG Enrichment Analysis")
 
+# IDs such as "00123" must keep their leading zeros on every read path
+ANNOTATION_TEXT_COLUMNS = {"Term": str, "GeneID": str}
+
+# Pasted gene lists are split on commas, semicolons and any whitespace
+GENE_DELIMITERS = str.maketrans(",;", "  ")
+
+
+# --- Cached Loaders ---
+@st.cache_data
+def parse_gene_list(text: str) -> tuple:
+    """Split pasted text into unique gene IDs, keeping first-seen order."""
+    return tuple(dict.fromkeys(text.translate(GENE_DELIMITERS).split()))
+
+
+@st.cache_data
+def load_gene_list(file_bytes: bytes) -> tuple:
+    """Read unique gene IDs from the first column of an uploaded gene list."""
+    # Read as text so zero-padded IDs match the annotation's GeneID column
+    df = pd.read_csv(io.BytesIO(file_bytes), header=None, dtype=str)
+    return tuple(df.iloc[:, 0].dropna().astype(str).unique())
+
+
+@st.cache_resource(max_entries=8)
+def load_annotation(file_bytes: bytes, sep: str) -> Tuple[pd.DataFrame, Optional[pd.Series]]:
+    """Parse an uploaded GO/KEGG annotation table and index its p-values by term.
+
+    The result is shared across reruns (and sessions), so it must not be modified.
+    """
+    try:
+        ann_df = pa_csv.read_csv(
+            io.BytesIO(file_bytes),
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.string() for col in ANNOTATION_TEXT_COLUMNS},
+                strings_can_be_null=True,
+            ),
+        ).to_pandas()
+    except pa.ArrowInvalid:
+        # pyarrow rejects rows shorter than the header (e.g. no trailing p-value);
+        # the C reader fills the missing fields with NaN
+        ann_df = pd.read_csv(io.BytesIO(file_bytes), sep=sep, dtype=ANNOTATION_TEXT_COLUMNS)
+    # Repeated IDs and terms are stored once; filtering and grouping use integer codes
+    for col in ("Term", "GeneID"):
+        if col in ann_df.columns:
+            ann_df[col] = ann_df[col].astype("category")
+    term_pvals = None
+    if {"Term", "p-value"} <= set(ann_df.columns):
+        term_pvals = ann_df.groupby("Term", observed=True)["p-value"].first()
+    return ann_df, term_pvals
+
+
+# --- Plotting ---
+def draw_enrichment(term_stats: pd.DataFrame, orientation: str, color_palette: str,
+                    font_size: int, title_font_size: int) -> Figure:
+    """Draw gene counts of the selected terms as a bar chart."""
+    # A standalone Agg figure, kept out of pyplot's global figure registry so the download
+    # callback can render it from Streamlit's worker thread
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    colors = colormaps[color_palette](np.linspace(0, 1, len(term_stats)))
+
+    if orientation == "Horizontal":
+        ax.barh(term_stats["Term"], term_stats["gene_count"], color=colors)
+        ax.invert_yaxis()  # keep the top-ranked term first
+        ax.set_xlabel("Gene Count", fontsize=font_size)
+        ax.set_ylabel("GO/KEGG Term", fontsize=font_size)
+    else:
+        ax.bar(term_stats["Term"], term_stats["gene_count"], color=colors)
+        ax.set_ylabel("Gene Count", fontsize=font_size)
+        ax.set_xlabel("GO/KEGG Term", fontsize=font_size)
+        ax.tick_params(axis='x', rotation=45)
+
+    ax.set_title("Top Enriched GO/KEGG Terms", fontsize=title_font_size)
+    fig.tight_layout()
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def render_png(term_stats: pd.DataFrame, orientation: str, color_palette: str,
+               font_size: int, title_font_size: int) -> bytes:
+    """Render the enrichment plot to 300 dpi PNG bytes for download."""
+    fig = draw_enrichment(term_stats, orientation, color_palette, font_size, title_font_size)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight", dpi=300)
+    return buf.getvalue()
+
+
 # --- Sidebar Settings ---
 with st.sidebar:
     st.header("⚙️ Display Settings")
@@ -28,88 +120,59 @@ input_method = st.radio("Input method:", ["Paste gene list", "Upload gene list f
 
 if input_method == "Paste gene list":
     input_gene_text = st.text_area("Paste gene IDs (comma, newline, tab, or space separated):", height=200)
-    gene_list = list({g.strip() for g in re.split(r'[\n,;\t ]+', input_gene_text) if g.strip()})
+    gene_list = parse_gene_list(input_gene_text)
 else:
     gene_file = st.file_uploader("Upload gene list file (.txt or .csv)", type=["txt", "csv"])
-    gene_list = []
+    gene_list = ()
     if gene_file is not None:
-        df = pd.read_csv(gene_file, header=None)
-        gene_list = list(df.iloc[:, 0].dropna().astype(str).unique())
+        gene_list = load_gene_list(gene_file.getvalue())
 
 if not gene_list:
     st.warning("⚠️ No valid gene IDs provided.")
     st.stop()
 
 st.success(f"✅ {len(gene_list)} unique gene IDs received.")
+gene_index = pd.Index(gene_list)
 
 # --- Annotation Upload ---
 st.header("📚 Upload GO/KEGG Annotation File")
 annotation_file = st.file_uploader("Upload full background annotation file (GO/KEGG with columns: Term, GeneID, p-value)", type=["csv", "tsv"])
 
 if annotation_file is not None:
-    if annotation_file.name.endswith(".tsv"):
-        ann_df = pd.read_csv(annotation_file, sep="\t")
-    else:
-        ann_df = pd.read_csv(annotation_file)
+    sep = "\t" if annotation_file.name.endswith(".tsv") else ","
+    ann_df, term_pvals = load_annotation(annotation_file.getvalue(), sep)
 
     if not all(col in ann_df.columns for col in ["Term", "GeneID"]):
         st.error("❌ Annotation file must have columns: Term, GeneID")
         st.stop()
 
     # Filter annotation for selected genes
-    ann_df["GeneID"] = ann_df["GeneID"].astype(str)
-    filtered_df = ann_df[ann_df["GeneID"].isin(gene_list)]
+    filtered_df = ann_df[ann_df["GeneID"].isin(gene_index)]
 
     if filtered_df.empty:
         st.warning("⚠️ No matching genes found in annotation.")
         st.stop()
 
-    term_stats = (
-        filtered_df.groupby("Term")
-        .agg(gene_count=("GeneID", "count"))
-        .reset_index()
-    )
+    term_stats = filtered_df.groupby("Term", observed=True).size().reset_index(name="gene_count")
+    term_stats["Term"] = term_stats["Term"].astype(str)
 
-    # Merge with p-values if provided
-    if "p-value" in ann_df.columns:
-        pval_df = ann_df[["Term", "p-value"]].drop_duplicates()
-        term_stats = pd.merge(term_stats, pval_df, on="Term", how="left")
+    # Look up one p-value per term if provided
+    if term_pvals is not None:
+        term_stats["p-value"] = term_stats["Term"].map(term_pvals)
     else:
         term_stats["p-value"] = 1.0
 
-    # Sort and limit
-    term_stats = term_stats.sort_values(
-        "p-value" if sort_by == "p-value" else "gene_count",
-        ascending=(sort_by == "p-value")
-    ).head(top_n)
-
-    st.subheader("📈 Enrichment Plot")
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    if orientation == "Horizontal":
-        sns.barplot(
-            data=term_stats,
-            x="gene_count",
-            y="Term",
-            palette=color_palette,
-            ax=ax
-        )
-        ax.set_xlabel("Gene Count", fontsize=font_size)
-        ax.set_ylabel("GO/KEGG Term", fontsize=font_size)
+    # Select the top terms (partial sort; nsmallest needs numbers, so text p-values such as
+    # "<1e-10" keep the full sort)
+    if sort_by == "p-value" and not pd.api.types.is_numeric_dtype(term_stats["p-value"]):
+        term_stats = term_stats.sort_values("p-value", kind="stable").head(top_n)
+    elif sort_by == "p-value":
+        term_stats = term_stats.nsmallest(top_n, "p-value")
     else:
-        sns.barplot(
-            data=term_stats,
-            x="Term",
-            y="gene_count",
-            palette=color_palette,
-            ax=ax
-        )
-        ax.set_ylabel("Gene Count", fontsize=font_size)
-        ax.set_xlabel("GO/KEGG Term", fontsize=font_size)
-        ax.tick_params(axis='x', rotation=45)
+        term_stats = term_stats.nlargest(top_n, "gene_count")
 
-    ax.set_title("Top Enriched GO/KEGG Terms", fontsize=title_font_size)
-    plt.tight_layout()
+    st.subheader("📈 Enrichment Plot")
+    fig = draw_enrichment(term_stats, orientation, color_palette, font_size, title_font_size)
     st.pyplot(fig)
 
     # Downloads
@@ -117,9 +180,12 @@ if annotation_file is not None:
     out_csv = term_stats.to_csv(index=False).encode("utf-8")
     st.download_button("📥 Download Table (CSV)", out_csv, "enrichment_results.csv", "text/csv")
 
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight", dpi=300)
-    st.download_button("📥 Download Plot (PNG)", buf.getvalue(), "enrichment_plot.png", "image/png")
+    st.download_button(
+        "📥 Download Plot (PNG)",
+        lambda: render_png(term_stats, orientation, color_palette, font_size, title_font_size),
+        "enrichment_plot.png",
+        "image/png",
+    )
 
 else:
     st.info("Upload annotation file to proceed.")
@@ -41,6 +41,7 @@ from __future__ import annotations
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable, List
 
@@ -64,36 +65,35 @@ def run_command(cmd: Iterable[str], workdir: str | Path | None = None) -> None:
     executing it.  Uncomment the call to ``subprocess.run`` if you
     want to run the commands on your system.
     """
-    print("\n$", " ".join(cmd))
+    # Print as one string so lines from concurrent samples do not interleave
+    print("\n$ " + " ".join(cmd))
     # Uncomment the line below to actually run the command
     # subprocess.run(cmd, cwd=workdir, check=True)
 
 
-def main() -> None:
-    """Execute the RNA‑seq workflow.
+def process_sample(
+    run_id: str,
+    raw_dir: Path,
+    qc_dir: Path,
+    trimmed_dir: Path,
+    index_dir: Path,
+    align_dir: Path,
+) -> Path:
+    """Download, quality-check, trim and align a single SRA run.
 
-    This function orchestrates the steps of the pipeline.  It sets
-    up directories, constructs commands for each stage, and prints
-    them.  Adjust the paths and sample identifiers to match your
-    experimental design.
+    Parameters
+    ----------
+    run_id:
+        SRA run accession, e.g. ``SRR1234567``.
+    raw_dir, qc_dir, trimmed_dir, index_dir, align_dir:
+        Project directories created by :func:`main`.  The STAR index in
+        ``index_dir`` must already exist.
+
+    Returns
+    -------
+    Path
+        The coordinate-sorted BAM file written by STAR.
     """
-    # Define project directories
-    project_root = Path("/home/utsab/projects/rnaseq")
-    raw_dir = project_root / "raw_data"
-    qc_dir = project_root / "qc"
-    trimmed_dir = project_root / "trimmed"
-    index_dir = project_root / "genome_index"
-    align_dir = project_root / "alignment"
-    counts_dir = project_root / "counts"
-    results_dir = project_root / "results"
-
-    # Example sample accession from SRA
-    run_id = "SRR1234567"
-
-    # Create directories (no effect if they already exist)
-    for d in [raw_dir, qc_dir, trimmed_dir, index_dir, align_dir, counts_dir, results_dir]:
-        d.mkdir(parents=True, exist_ok=True)
-
     # Step 1: Data retrieval
     run_command(["prefetch", run_id], workdir=raw_dir)
     run_command(["fastq-dump", "--split-files", f"{run_id}.sra", "--gzip"], workdir=raw_dir)
@@ -105,7 +105,6 @@ def main() -> None:
         str(raw_dir / f"{run_id}_1.fastq.gz"),
         str(raw_dir / f"{run_id}_2.fastq.gz"),
     ])
-    run_command(["multiqc", str(qc_dir), "-o", str(qc_dir)])
 
     # Step 3: Trimming
     run_command([
@@ -116,17 +115,7 @@ def main() -> None:
         "-o", str(trimmed_dir),
     ])
 
-    # Step 4: Build genome index and align
-    genome_fasta = Path("/home/utsab/genomes/Brassica_oleracea_genome.fa")
-    annotation_gtf = Path("/home/utsab/genomes/Brassica_oleracea_annotation.gtf")
-    run_command([
-        "STAR",
-        "--runThreadN", "8",
-        "--runMode", "genomeGenerate",
-        "--genomeDir", str(index_dir),
-        "--genomeFastaFiles", str(genome_fasta),
-        "--sjdbGTFfile", str(annotation_gtf),
-    ])
+    # Step 4: Align to the shared genome index
     run_command([
         "STAR",
         "--runThreadN", "8",
@@ -138,8 +127,68 @@ def main() -> None:
         "--outFileNamePrefix", str(align_dir / f"{run_id}_"),
         "--outSAMtype", "BAM", "SortedByCoordinate",
     ])
+    return align_dir / f"{run_id}_Aligned.sortedByCoord.out.bam"
+
+
+def main(n_parallel: int = 2) -> None:
+    """Execute the RNA‑seq workflow.
+
+    This function orchestrates the steps of the pipeline.  It sets
+    up directories, constructs commands for each stage, and prints
+    them.  Adjust the paths and sample identifiers to match your
+    experimental design.
+
+    Parameters
+    ----------
+    n_parallel:
+        Number of samples processed concurrently.  While one sample is
+        being aligned, the next can be downloaded, checked and trimmed.
+        Each STAR job uses 8 threads, so size this to your node.
+    """
+    # Define project directories
+    project_root = Path("/home/utsab/projects/rnaseq")
+    raw_dir = project_root / "raw_data"
+    qc_dir = project_root / "qc"
+    trimmed_dir = project_root / "trimmed"
+    index_dir = project_root / "genome_index"
+    align_dir = project_root / "alignment"
+    counts_dir = project_root / "counts"
+    results_dir = project_root / "results"
+
+    # Example sample accessions from SRA (add one per library)
+    run_ids = ["SRR1234567"]
+
+    # Create directories (no effect if they already exist)
+    for d in [raw_dir, qc_dir, trimmed_dir, index_dir, align_dir, counts_dir, results_dir]:
+        d.mkdir(parents=True, exist_ok=True)
+
+    # Build the genome index once; every sample aligns against it
+    genome_fasta = Path("/home/utsab/genomes/Brassica_oleracea_genome.fa")
+    annotation_gtf = Path("/home/utsab/genomes/Brassica_oleracea_annotation.gtf")
+    run_command([
+        "STAR",
+        "--runThreadN", "8",
+        "--runMode", "genomeGenerate",
+        "--genomeDir", str(index_dir),
+        "--genomeFastaFiles", str(genome_fasta),
+        "--sjdbGTFfile", str(annotation_gtf),
+    ])
+
+    # Steps 1-4 per sample.  The external tools do the work and
+    # subprocess.run releases the GIL, so threads are enough to overlap
+    # one sample's downloads and trimming with another's alignment.
+    with ThreadPoolExecutor(max_workers=n_parallel) as pool:
+        bam_files = list(pool.map(
+            lambda run_id: process_sample(
+                run_id, raw_dir, qc_dir, trimmed_dir, index_dir, align_dir
+            ),
+            run_ids,
+        ))
+
+    # Summarise FastQC reports for all samples
+    run_command(["multiqc", str(qc_dir), "-o", str(qc_dir)])
 
-    # Step 5: Generate gene counts
+    # Step 5: Generate gene counts (one column per sample)
     run_command([
         "featureCounts",
         "-T", "8",
@@ -148,7 +197,7 @@ def main() -> None:
         "-g", "gene_id",
         "-a", str(annotation_gtf),
         "-o", str(counts_dir / "gene_counts.txt"),
-        str(align_dir / f"{run_id}_Aligned.sortedByCoord.out.bam"),
+        *[str(bam) for bam in bam_files],
     ])
 
     # Step 6: Differential expression (run in R)
@@ -169,6 +218,7 @@ def main() -> None:
             hover_name=df.index,
             labels={"logFC": "Log2 fold change", "P.Value": "p‑value"},
             title="Interactive Volcano Plot: 36h vs 0h",
+            render_mode="webgl",
         )
         fig.update_yaxes(type="log")
         fig.show()
@@ -3,75 +3,190 @@
 # - Custom intersection region colors (4-6 sets only)
 # - Download exclusive elements for each set
 
+import csv
+import hashlib
 import io
-import re
-from typing import Dict, Set, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, combinations
+from typing import Dict, FrozenSet, List, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
-import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib_venn import venn2, venn3
-from venn import venn as venn_up_to_6
+from venn import draw_venn, generate_colors
 
 st.set_page_config(page_title="Multi-Set Venn (up to 6)", layout="wide")
 
-def coerce_items(text: str, split_mode: str, case_sensitive: bool) -> Set[str]:
+# Arrow-backed string columns go to st.dataframe (and through the cache pickles) without object conversion
+ARROW_STRING = pd.ArrowDtype(pa.large_string())
+
+# "Auto" treats commas, tabs, semicolons and pipes as line breaks
+AUTO_DELIMITERS = str.maketrans(",\t;|", "\n\n\n\n")
+
+# Single-character delimiter for the remaining "Split items by" options; str.split is
+# enough because the empty items between repeated delimiters are dropped when cleaning
+SPLIT_DELIMITERS = {
+    "Commas": ",",
+    "Tabs": "\t",
+    "Semicolons": ";",
+    "Pipes (|)": "|",
+}
+
+# Cells the upload CSV reader turns into missing values (pandas' default na_values)
+NA_TOKENS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+# Cells pyarrow reads as booleans
+BOOL_TOKENS = frozenset({"true", "True", "TRUE", "false", "False", "FALSE"})
+
+def is_text_cell(value: str) -> bool:
+    """True if the CSV reader can only type this cell as text (not a number, boolean or date)."""
+    value = value.strip()
+    if value[:1].isdigit() or value in BOOL_TOKENS:
+        return False
+    try:
+        float(value)
+    except ValueError:
+        return True
+    return False
+
+def input_fingerprint(data: bytes, *options) -> str:
+    """Digest of a set's raw input and parse options, a cheap stand-in for the parsed set in cache keys."""
+    digest = hashlib.blake2b(data, digest_size=16)
+    digest.update(repr(options).encode())
+    return digest.hexdigest()
+
+def clean_items(parts, lower: bool) -> FrozenSet[str]:
+    """Strip each part and drop empties, lowercasing them if `lower` is set."""
+    items = filter(None, map(str.strip, parts))
+    if lower:
+        items = map(str.lower, items)
+    return frozenset(items)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def coerce_items(text: str, split_mode: str, case_sensitive: bool) -> FrozenSet[str]:
     if not text:
-        return set()
+        return frozenset()
+    # One lower() over the whole text is far cheaper than one per item
+    if not case_sensitive:
+        text = text.lower()
     if split_mode == "Auto":
-        parts = re.split(r"[\n,\t;|]+", text)
+        parts = text.translate(AUTO_DELIMITERS).splitlines()
     elif split_mode == "Newlines (one per line)":
-        parts = re.split(r"\n+", text)
-    elif split_mode == "Commas":
-        parts = re.split(r",+", text)
-    elif split_mode == "Tabs":
-        parts = re.split(r"\t+", text)
-    elif split_mode == "Semicolons":
-        parts = re.split(r";+", text)
-    elif split_mode == "Pipes (|)":
-        parts = re.split(r"\|+", text)
+        parts = text.splitlines()
     else:
-        parts = [text]
+        delimiter = SPLIT_DELIMITERS.get(split_mode)
+        parts = text.split(delimiter) if delimiter else [text]
 
-    cleaned = [p.strip().lower() if not case_sensitive else p.strip() for p in parts if p.strip()]
-    return set(cleaned)
+    # Case has already been folded above when needed
+    return clean_items(parts, lower=False)
 
-def read_file_to_set(file, split_mode: str, case_sensitive: bool) -> Set[str]:
+@st.cache_data(show_spinner=False, max_entries=64)
+def read_file_to_set(data: bytes, filename: str, split_mode: str, case_sensitive: bool) -> FrozenSet[str]:
+    # A plain ASCII list (no delimiters or quoting) is one column: split its lines directly instead
+    # of building a DataFrame. This follows the pyarrow reader below: \n, \r\n and \r end lines,
+    # empty lines are skipped, the first remaining line is the header and NA tokens are missing.
+    if data.isascii() and b"," not in data and b"\t" not in data and b'"' not in data:
+        text = data.decode("utf-8-sig")
+        lines = [line for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n") if line]
+        values = [line for line in lines[1:] if line not in NA_TOKENS]
+        # If every value could be a number, boolean or date, the reader would convert the column
+        # (e.g. "001" -> "1"), so leave those lists to it
+        if any(map(is_text_cell, values)):
+            return clean_items(values, lower=not case_sensitive)
     try:
-        if file.name.lower().endswith((".tsv",)):
-            df = pd.read_csv(file, sep="\t")
+        sep = "\t" if filename.lower().endswith((".tsv",)) else ","
+        # pyarrow's multithreaded reader is much faster on large uploads, but it keeps invalid
+        # UTF-8 as raw bytes; anything non-ASCII goes to the C reader, which drops bad bytes instead
+        if data.isascii():
+            try:
+                df = pd.read_csv(io.BytesIO(data), sep=sep, engine="pyarrow")
+            except pd.errors.ParserError:
+                # pyarrow rejects rows shorter than the header (e.g. gene lists of unequal length),
+                # which the C reader pads with missing cells. Input it reads no rows from (a lone
+                # line) still goes to the text fallback below.
+                df = pd.read_csv(io.BytesIO(data), sep=sep)
+                if df.empty:
+                    raise
         else:
-            df = pd.read_csv(file)
-        flat = df.astype(str).values.ravel().tolist()
-        text = "\n".join([x for x in flat if x and x.lower() != "nan"])
-        return coerce_items(text, "Newlines (one per line)", case_sensitive)
+            df = pd.read_csv(io.BytesIO(data), sep=sep, encoding_errors="ignore")
+        # Clean every cell with vectorised string ops instead of re-joining and re-splitting
+        cells = df.to_numpy(dtype=object).ravel(order="K")
+        values = pd.Series(cells).dropna().astype(str).str.strip()
+        values = values[values != ""]
+        if not case_sensitive:
+            values = values.str.lower()
+        return frozenset(values.tolist())
     except Exception:
-        file.seek(0)
-        text = file.read().decode("utf-8", errors="ignore")
+        text = data.decode("utf-8", errors="ignore")
         return coerce_items(text, split_mode, case_sensitive)
 
-def sets_to_mutually_exclusive_intersections(sets_dict: Dict[str, Set[str]]) -> pd.DataFrame:
-    from itertools import combinations
+def encode_sets(sets_dict: Dict[str, FrozenSet[str]]) -> Tuple[List[np.ndarray], np.ndarray]:
+    """Replace elements with integer codes shared by all sets.
 
-    names = list(sets_dict.keys())
-    all_intersections = []
-    already_seen = set()
+    Returns the coded sets (in dict order) and the element behind each code.
+    """
+    # One hash-table pass over every set laid end to end, then cut back at the set boundaries
+    sizes = [len(s) for s in sets_dict.values()]
+    elements = np.fromiter(chain.from_iterable(sets_dict.values()), dtype=object, count=sum(sizes))
+    codes, universe = pd.factorize(elements)
+    return np.split(codes, np.cumsum(sizes)[:-1]), universe
+
+def element_memberships(sets_dict: Dict[str, FrozenSet[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the distinct elements and a uint8 bitmask of the sets (in dict order) containing each."""
+    encoded, universe = encode_sets(sets_dict)
+    membership = np.zeros(len(universe), dtype=np.uint8)
+    for i, coded in enumerate(encoded):
+        membership[coded] |= np.uint8(1 << i)
+    return universe, membership
+
+def element_regions(sets_dict: Dict[str, FrozenSet[str]]) -> Dict[int, List[str]]:
+    """Group elements by the bitmask of the sets containing them."""
+    universe, membership = element_memberships(sets_dict)
+    region_sizes = np.bincount(membership, minlength=1 << len(sets_dict))
+    return {int(mask): universe[membership == mask].tolist() for mask in np.flatnonzero(region_sizes)}
 
+@st.cache_data(show_spinner=False, max_entries=64)
+def venn_petal_labels(sets_key: tuple, _sets_dict: Dict[str, FrozenSet[str]]) -> Dict[str, str]:
+    """Region sizes keyed by the venn package's petal ids ("0110": in sets 2 and 3 only)."""
+    _, membership = element_memberships(_sets_dict)
+    n = len(_sets_dict)
+    region_sizes = np.bincount(membership, minlength=1 << n)
+    # Petal ids list set 1 first, i.e. the bitmask read back to front
+    logics = (format(i, f"0{n}b") for i in range(1, 1 << n))
+    return {logic: str(region_sizes[int(logic[::-1], 2)]) for logic in logics}
+
+def sets_to_mutually_exclusive_intersections(sets_dict: Dict[str, FrozenSet[str]], regions: Dict[int, List[str]]) -> pd.DataFrame:
+    names = list(sets_dict.keys())
+    # Every element falls in exactly one region: the combination of sets holding it.
+    # One row per non-empty region, built as columns rather than a dict per row
+    keys: List[str] = []
+    sizes = np.empty(len(regions), dtype=np.int64)
+    elements: List[List[str]] = []
     # Start with largest intersections first (e.g., ABC before AB)
     for k in range(len(names), 0, -1):
-        for comb in combinations(names, k):
-            label = " ∩ ".join(comb)
-            intersection = set.intersection(*(sets_dict[name] for name in comb))
-            # Remove already counted elements in larger intersections
-            exclusive = intersection - already_seen
+        for comb in combinations(range(len(names)), k):
+            exclusive = regions.get(sum(1 << i for i in comb))
             if exclusive:
-                all_intersections.append({
-                    "Sets": label,
-                    "Size": len(exclusive),
-                    "Elements": ", ".join(sorted(exclusive))
-                })
-                already_seen.update(exclusive)
+                sizes[len(keys)] = len(exclusive)
+                keys.append(" ∩ ".join(names[i] for i in comb))
+                # Elements stay unsorted lists; they are only joined for the CSV download
+                elements.append(exclusive)
 
-    return pd.DataFrame(all_intersections).sort_values("Size", ascending=False)
+    # Largest regions first; the stable integer sort keeps ties in the order built above
+    order = np.argsort(-sizes, kind="stable")
+    return pd.DataFrame({
+        "Sets": pd.array([keys[i] for i in order], dtype=ARROW_STRING),
+        "Size": sizes[order],
+        "Elements": [elements[i] for i in order],
+    })
 
 
 def blend_colors(*hex_colors):
@@ -82,23 +197,24 @@ def blend_colors(*hex_colors):
     avg_rgb = tuple(sum(vals) // len(vals) for vals in zip(*rgb_vals))
     return f'#{avg_rgb[0]:02x}{avg_rgb[1]:02x}{avg_rgb[2]:02x}'
 
-def draw_venn_2_3(sets_dict: Dict[str, Set[str]], colors: List[str], title: str, title_fontsize: int, label_fontsize: int) -> plt.Figure:
-    from matplotlib_venn import venn2, venn3
-
+def draw_venn_2_3(sets_dict: Dict[str, FrozenSet[str]], colors: List[str], title: str, title_fontsize: int, label_fontsize: int) -> Figure:
     names = list(sets_dict.keys())
     n = len(names)
-    plt.figure(figsize=(7, 6), dpi=180)
-    plt.title(title, fontsize=title_fontsize)
+    # A standalone Agg figure, kept out of pyplot's global figure registry
+    fig = Figure(figsize=(7, 6), dpi=96)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_title(title, fontsize=title_fontsize)
 
     if n == 2:
-        v = venn2([sets_dict[names[0]], sets_dict[names[1]]], set_labels=(names[0], names[1]))
+        v = venn2([sets_dict[names[0]], sets_dict[names[1]]], set_labels=(names[0], names[1]), alpha=0.6, ax=ax)
         patches = {
             '10': colors[0],
             '01': colors[1],
             '11': blend_colors(colors[0], colors[1]),
         }
     else:
-        v = venn3([sets_dict[n] for n in names], set_labels=names)
+        v = venn3([sets_dict[n] for n in names], set_labels=names, alpha=0.6, ax=ax)
         patches = {
             '100': colors[0],
             '010': colors[1],
@@ -109,54 +225,108 @@ def draw_venn_2_3(sets_dict: Dict[str, Set[str]], colors: List[str], title: str,
             '111': blend_colors(colors[0], colors[1], colors[2]),
         }
 
-    # Apply colors to each patch
+    # Apply colors to each patch (venn2/venn3 already set the alpha)
     for pid, color in patches.items():
         p = v.get_patch_by_id(pid)
         if p:
             p.set_color(color)
-            p.set_alpha(0.6)
 
     # Font sizes
-    for label in v.set_labels:
-        if label:
-            label.set_fontsize(label_fontsize)
-    for text in v.subset_labels:
-        if text:
-            text.set_fontsize(label_fontsize)
+    setp([t for t in (*v.set_labels, *v.subset_labels) if t], fontsize=label_fontsize)
 
-    return plt.gcf()
+    return fig
 
 
 
 
-def draw_venn_4_6(sets_dict, colors, title, title_fontsize, label_fontsize):
-    import matplotlib.colors as mcolors
+def draw_venn_4_6(sets_dict, colors, title, title_fontsize, label_fontsize, petal_labels):
     cmap = mcolors.ListedColormap(colors)
-    plt.figure(figsize=(10, 8), dpi=180)
-    ax = venn_up_to_6(sets_dict, cmap=cmap)
-    for text in ax.texts:
-        if text:
-            text.set_fontsize(label_fontsize)
-    plt.title(title, fontsize=title_fontsize)
-    return plt.gcf()
-
-def get_exclusive_elements(sets_dict: Dict[str, Set[str]]) -> pd.DataFrame:
-    exclusive = {}
-    for name, s in sets_dict.items():
-        others = set().union(*(v for k, v in sets_dict.items() if k != name))
-        exclusive[name] = sorted(s - others)
-    return pd.DataFrame({"Set": exclusive.keys(), "Exclusive Elements": exclusive.values()})
-
-def fig_download_buttons(fig):
+    fig = Figure(figsize=(8, 8), dpi=96)
+    FigureCanvasAgg(fig)
+    # Only the region sizes depend on the data (the shapes are fixed), so draw from the given counts
+    ax = draw_venn(
+        petal_labels=petal_labels, dataset_labels=sets_dict.keys(), hint_hidden=False,
+        colors=generate_colors(cmap=cmap, n_colors=len(sets_dict), alpha=.4),
+        figsize=(8, 8), fontsize=13, legend_loc="upper right", ax=fig.add_subplot(),
+    )
+    setp(ax.texts, fontsize=label_fontsize)
+    ax.set_title(title, fontsize=title_fontsize)
+    return fig
+
+def get_exclusive_elements(sets_dict: Dict[str, FrozenSet[str]], regions: Dict[int, List[str]]) -> pd.DataFrame:
+    # Elements exclusive to set i are those whose region mask is just bit i
+    exclusive = {name: sorted(regions.get(1 << i, [])) for i, name in enumerate(sets_dict)}
+    excl_df = pd.DataFrame({"Set": exclusive.keys(), "Exclusive Elements": exclusive.values()})
+    return excl_df.astype({"Set": ARROW_STRING})
+
+def rows_to_csv_bytes(header, rows) -> bytes:
+    """Write rows as UTF-8 CSV straight into a byte buffer (no intermediate str)."""
+    buf = io.BytesIO()
+    text = io.TextIOWrapper(buf, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()  # leave buf open after the wrapper goes away
+    return buf.getvalue()
+
+def df_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    return rows_to_csv_bytes(df.columns, df.itertuples(index=False, name=None))
+
+def intersections_csv(inter_df: pd.DataFrame) -> bytes:
+    """Write the intersection table as CSV, sorting and joining each region's elements."""
+    return rows_to_csv_bytes(
+        ["Sets", "Size", "Elements"],
+        ((sets, size, ", ".join(sorted(elements)))
+         for sets, size, elements in inter_df.itertuples(index=False, name=None)),
+    )
+
+# Keyed on the sets' input fingerprints; hashing every element of `_sets_dict` on each rerun
+# would cost more than rebuilding the tables
+@st.cache_data(show_spinner=False, max_entries=128)
+def compute_tables(sets_key: tuple, _sets_dict: Dict[str, FrozenSet[str]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Build the intersection and exclusive-element tables, reused while the sets are unchanged."""
+    # Both tables are read off the same element regions, built in one pass
+    regions = element_regions(_sets_dict)
+    return sets_to_mutually_exclusive_intersections(_sets_dict, regions), get_exclusive_elements(_sets_dict, regions)
+
+# Per session, so a cached figure is never shared with another session. Download callbacks still
+# save it from Streamlit's worker threads, so it comes with a lock that every render holds.
+@st.cache_resource(show_spinner=False, max_entries=8, scope="session")
+def venn_figure(n_sets: int, sets_key: tuple, colors: tuple, title: str, title_fontsize: int, label_fontsize: int,
+                _sets_dict: Dict[str, FrozenSet[str]]) -> Tuple[Figure, threading.Lock]:
+    """Draw the Venn diagram once per distinct set contents (`sets_key`) and styling."""
+    if n_sets in (2, 3):
+        fig = draw_venn_2_3(_sets_dict, list(colors), title, title_fontsize, label_fontsize)
+    else:
+        petal_labels = venn_petal_labels(sets_key, _sets_dict)
+        fig = draw_venn_4_6(_sets_dict, list(colors), title, title_fontsize, label_fontsize, petal_labels)
+    return fig, threading.Lock()
+
+# Bounded: 300 dpi PNGs are large and the cache is shared by every session
+@st.cache_data(show_spinner=False, max_entries=32)
+def render_figure(_fig: Figure, _lock: threading.Lock, fig_key: tuple, fmt: str) -> bytes:
+    """Serialise a figure for display or download; `fig_key` stands in for the unhashable figure."""
+    buf = io.BytesIO()
+    # savefig restyles the figure while it draws (e.g. transparent=True clears its face colours)
+    with _lock:
+        if fmt == "png":
+            _fig.savefig(buf, format="png", bbox_inches="tight", dpi=300, transparent=True)
+        elif fmt == "screen":
+            # Screen resolution only (downloads stay at 300 dpi); cached so reruns don't redraw it
+            _fig.savefig(buf, format="png", bbox_inches="tight", dpi=96)
+        else:
+            _fig.savefig(buf, format="svg", bbox_inches="tight")
+    return buf.getvalue()
+
+def fig_download_buttons(fig, fig_lock, fig_key: tuple):
+    # Rendered only when a button is clicked, in a Streamlit worker thread; render_figure still
+    # caches repeat clicks
     col1, col2 = st.columns(2)
     with col1:
-        png_buf = io.BytesIO()
-        fig.savefig(png_buf, format="png", bbox_inches="tight", dpi=300, transparent=True)
-        st.download_button("⬇️ Download PNG", png_buf.getvalue(), file_name="venn.png", mime="image/png")
+        st.download_button("⬇️ Download PNG", lambda: render_figure(fig, fig_lock, fig_key, "png"), file_name="venn.png", mime="image/png")
     with col2:
-        svg_buf = io.BytesIO()
-        fig.savefig(svg_buf, format="svg", bbox_inches="tight")
-        st.download_button("⬇️ Download SVG", svg_buf.getvalue(), file_name="venn.svg", mime="image/svg+xml")
+        st.download_button("⬇️ Download SVG", lambda: render_figure(fig, fig_lock, fig_key, "svg"), file_name="venn.svg", mime="image/svg+xml")
 
 # === UI ===
 st.title("🧬 Venn Diagram Builder (up to 6 sets)")
@@ -165,44 +335,58 @@ with st.sidebar:
     n_sets = st.slider("Number of sets", 2, 6, 3)
     split_mode = st.selectbox("Split items by", ["Auto", "Newlines (one per line)", "Commas", "Tabs", "Semicolons", "Pipes (|)"])
     case_sensitive = st.checkbox("Case sensitive matching", value=False)
-    title = st.text_input("Venn diagram title", value="Venn Diagram")
-    title_fontsize = st.slider("Title font size", 10, 30, 16)
-    label_fontsize = st.slider("Label font size", 8, 24, 10)
-    set_names = [st.text_input(f"Name for Set {i+1}", value=f"Set {i+1}") for i in range(n_sets)]
-    set_colors = [st.color_picker(f"Color for Set {i+1}", value=["#4c78a8", "#f58518", "#54a24b", "#e45756", "#72b7b2", "#b279a2"][i]) for i in range(n_sets)]
+    # Styling edits are batched into one rerun on "Apply" instead of one per slider drag or keystroke
+    with st.form("venn_style"):
+        title = st.text_input("Venn diagram title", value="Venn Diagram")
+        title_fontsize = st.slider("Title font size", 10, 30, 16)
+        label_fontsize = st.slider("Label font size", 8, 24, 10)
+        set_names = [st.text_input(f"Name for Set {i+1}", value=f"Set {i+1}") for i in range(n_sets)]
+        set_colors = [st.color_picker(f"Color for Set {i+1}", value=["#4c78a8", "#f58518", "#54a24b", "#e45756", "#72b7b2", "#b279a2"][i]) for i in range(n_sets)]
+        st.form_submit_button("Apply")
 
-sets_dict: Dict[str, Set[str]] = {}
+sets_dict: Dict[str, FrozenSet[str]] = {}
+# Fingerprint of each set's raw input, keyed like sets_dict
+set_keys: Dict[str, str] = {}
 if mode == "Upload files":
     files = st.file_uploader("Upload one file per set", type=["txt", "csv", "tsv"], accept_multiple_files=True)
     if files:
-        for i, f in enumerate(files[:n_sets]):
-            sets_dict[set_names[i]] = read_file_to_set(f, split_mode, case_sensitive)
+        # Files are independent, so parse them concurrently. This only overlaps the pandas
+        # readers, which release the GIL (the C reader used for non-ASCII uploads; pyarrow is
+        # multithreaded on its own); the plain-list path is pure Python and runs one at a time.
+        # The bytes are read here so worker threads never touch the UploadedFile objects.
+        uploads = [(f.getvalue(), f.name) for f in files[:n_sets]]
+        with ThreadPoolExecutor(max_workers=len(uploads)) as pool:
+            parsed = pool.map(lambda u: read_file_to_set(u[0], u[1], split_mode, case_sensitive), uploads)
+            sets_dict.update(zip(set_names, parsed))
+        set_keys.update(zip(set_names, (input_fingerprint(data, name, split_mode, case_sensitive) for data, name in uploads)))
 else:
     for i in range(n_sets):
         txt = st.text_area(f"Paste items for {set_names[i]}", height=120)
         sets_dict[set_names[i]] = coerce_items(txt, split_mode, case_sensitive)
+        set_keys[set_names[i]] = input_fingerprint(txt.encode(), split_mode, case_sensitive)
 
-if sets_dict and all(len(s) > 0 for s in sets_dict.values()):
+if sets_dict and all(sets_dict.values()):
     st.subheader("📦 Set Sizes")
-    st.dataframe(pd.DataFrame({"Set": list(sets_dict.keys()), "Size": [len(s) for s in sets_dict.values()]}))
+    st.dataframe(pd.DataFrame({"Set": pd.array(list(sets_dict.keys()), dtype=ARROW_STRING), "Size": [len(s) for s in sets_dict.values()]}))
+    # Set names and input fingerprints identify the sets' contents without hashing every element
+    sets_key = tuple(set_keys.items())
 
     st.subheader("📊 Venn Diagram")
-    if n_sets in (2, 3):
-        fig = draw_venn_2_3(sets_dict, set_colors, title, title_fontsize, label_fontsize)
-    else:
-        fig = draw_venn_4_6(sets_dict, set_colors, title, title_fontsize, label_fontsize)
-    st.pyplot(fig, use_container_width=True)
-    fig_download_buttons(fig)
+    # Everything the figure depends on, so it and its renders are reused until one of them changes
+    fig_key = (n_sets, sets_key, tuple(set_colors), title, title_fontsize, label_fontsize)
+    fig, fig_lock = venn_figure(*fig_key, sets_dict)
+    # Shown at its native 96 dpi size; stretching it to the wide layout would upscale and blur it
+    st.image(render_figure(fig, fig_lock, fig_key, "screen"), width="content")
+    fig_download_buttons(fig, fig_lock, fig_key)
 
     st.subheader("🔄 Intersection Table")
-    inter_df = sets_to_mutually_exclusive_intersections(sets_dict)
-    st.dataframe(inter_df)
-    st.download_button("⬇️ Download Intersection Table (CSV)", inter_df.to_csv(index=False).encode("utf-8"), file_name="intersections.csv")
+    inter_df, excl_df = compute_tables(sets_key, sets_dict)
+    st.dataframe(pa.Table.from_pandas(inter_df[["Sets", "Size"]], preserve_index=False))
+    # The CSV (with every region's elements) is only built when the button is clicked
+    st.download_button("⬇️ Download Intersection Table (CSV)", lambda: intersections_csv(inter_df), file_name="intersections.csv")
 
     st.subheader("🧮 Exclusive Elements")
-    excl_df = get_exclusive_elements(sets_dict)
     st.dataframe(excl_df)
-    excl_csv = excl_df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Download Exclusive Elements (CSV)", excl_csv, file_name="exclusive_elements.csv")
+    st.download_button("⬇️ Download Exclusive Elements (CSV)", lambda: df_to_csv_bytes(excl_df), file_name="exclusive_elements.csv")
 else:
     st.info("Please provide valid input for each set.")